@@ -1,23 +1,131 @@
 #!/usr/bin/env python3
 import sys
 import os
+import multiprocessing
+from functools import lru_cache, partial
+from pathlib import Path
 import numpy as np
-import matplotlib.pyplot as plt
+import matplotlib
+# Object-oriented API on an Agg canvas: no pyplot global state, no GUI backend
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
 import itk
+from PIL import Image
 
-def convert_mhd_to_png(mhd_filename, output_filename=None):
-    if not os.path.exists(mhd_filename):
+# MetaImage ElementType -> numpy dtype
+MET_DTYPES = {
+    'MET_FLOAT': np.float32,
+    'MET_DOUBLE': np.float64,
+    'MET_SHORT': np.int16,
+    'MET_UCHAR': np.uint8,
+    'MET_USHORT': np.uint16,
+}
+
+# Figure width (inches) and resolution used for the saved PNG
+FIG_WIDTH_IN = 8
+SAVE_DPI = 300
+# zlib level for PNG output; 1 is much cheaper than the default 6 and noisy
+# projections barely compress further anyway
+PNG_COMPRESS_LEVEL = 1
+
+# 'gray' colormap as a (256, 3) uint8 lookup table, built once per process and
+# reused for every file (workers get their own copy at import, nothing to pickle)
+_GRAY_LUT = matplotlib.colormaps['gray'](np.arange(256), bytes=True)[:, :3]
+
+
+def downsample_for_display(array, target=FIG_WIDTH_IN * SAVE_DPI):
+    """
+    Block-average a 2D array so that its largest side is at most ~target pixels.
+    Trailing rows/columns that do not fill a whole block are cropped; returns
+    (array, f) so callers can size the physical extent from the cropped shape.
+    """
+    f = max(array.shape) // target
+    if f < 2:
+        return array, 1
+    h = (array.shape[0] // f) * f
+    w = (array.shape[1] // f) * f
+    return array[:h, :w].reshape(h // f, f, w // f, f).mean(axis=(1, 3)), f
+
+
+def _minmax_to_uint8(buf):
+    """Fused min/max reduction + scale to uint8 for a 2D array (compiled by Numba)."""
+    ny, nx = buf.shape
+    vmin = np.inf
+    vmax = -np.inf
+    for i in range(ny):
+        for j in range(nx):
+            v = buf[i, j]
+            vmin = min(vmin, v)
+            vmax = max(vmax, v)
+    scale = 255.0 / (vmax - vmin) if vmax > vmin else 0.0
+    out = np.empty((ny, nx), dtype=np.uint8)
+    for i in range(ny):
+        for j in range(nx):
+            out[i, j] = np.uint8((buf[i, j] - vmin) * scale)
+    return out
+
+
+@lru_cache(maxsize=None)
+def _minmax_kernel():
+    """
+    Numba-compiled _minmax_to_uint8, or None when Numba is not installed.
+    Imported on first use so the matplotlib path never loads Numba. Serial on
+    purpose: convert_many already runs one process per core.
+    """
+    try:
+        from numba import njit
+    except ImportError:  # Optional: falls back to the NumPy normalization
+        return None
+    return njit(cache=True)(_minmax_to_uint8)
+
+
+def normalize_to_uint8(array):
+    """
+    Min/max-normalize an array to uint8 in a single float32 buffer
+    (or in one compiled pass when Numba is installed).
+    """
+    kernel = _minmax_kernel() if array.ndim == 2 else None
+    if kernel is not None:
+        # Plain ndarray view (not memmap/ITK subclass) for Numba typing
+        return kernel(np.asarray(array))
+    vmin, vmax = float(array.min()), float(array.max())
+    scale = 255.0 / (vmax - vmin) if vmax > vmin else 0.0
+    out = np.subtract(array, vmin, dtype=np.float32)
+    out *= scale
+    np.clip(out, 0, 255, out=out)
+    return out.astype(np.uint8)
+
+
+def write_png_direct(array, output_filename, lut=None):
+    """
+    Write a 2D array straight to PNG with PIL, skipping the matplotlib figure
+    (no axes, colorbar or title). Rows are flipped to match origin='lower'.
+    """
+    if lut is None:
+        lut = _GRAY_LUT
+    rgb = lut[np.flipud(normalize_to_uint8(array))]
+    Image.fromarray(rgb).save(output_filename, optimize=False,
+                              compress_level=PNG_COMPRESS_LEVEL)
+
+
+def convert_mhd_to_png(mhd_filename, output_filename=None, raw=False, lut=None,
+                       dpi=SAVE_DPI):
+    # Parse the path once and reuse it for every derived name
+    mhd_path = Path(mhd_filename)
+    if not mhd_path.is_file():
         print(f"Error: File {mhd_filename} not found.")
         return
 
     if output_filename is None:
-        output_filename = os.path.splitext(mhd_filename)[0] + ".png"
+        output_filename = str(mhd_path.with_suffix(".png"))
 
     try:
         # Read the image using ITK
         image = itk.imread(mhd_filename)
-        # Get the array from the image
-        array = itk.GetArrayFromImage(image)
+        # Get a read-only view of the pixel buffer (no copy; we never write to it)
+        array = itk.array_view_from_image(image)
         
         # The array might be 3D (1, Y, X) or 2D (Y, X). Squeeze it.
         array = np.squeeze(array)
@@ -27,6 +135,11 @@ def convert_mhd_to_png(mhd_filename, output_filename=None):
             print(f"Error: Expected 2D image, got {array.ndim}D.")
             return
 
+        if raw:
+            write_png_direct(array, output_filename, lut)
+            print(f"Saved PNG (raw) to {output_filename}")
+            return
+
         # Get image spacing and size to set aspect ratio correctly
         spacing = image.GetSpacing() # (sx, sy, sz)
         size = image.GetLargestPossibleRegion().GetSize() # (nx, ny, nz)
@@ -39,26 +152,39 @@ def convert_mhd_to_png(mhd_filename, output_filename=None):
         print(f"Spacing: {spacing[0]} x {spacing[1]}")
         print(f"Physical Dimensions: {phys_width:.2f} x {phys_height:.2f} mm")
 
-        # Plotting
-        plt.figure(figsize=(8, 8 * (phys_height / phys_width)))
-        plt.imshow(array, cmap='gray', origin='lower', extent=[0, phys_width, 0, phys_height])
-        plt.colorbar(label='Counts')
-        plt.title(f"Projection: {os.path.basename(mhd_filename)}")
-        plt.xlabel("X (mm)")
-        plt.ylabel("Y (mm)")
-        
-        plt.tight_layout()
-        plt.savefig(output_filename, dpi=300)
+        # No point rasterizing more pixels than the PNG can hold
+        array, f = downsample_for_display(array, target=FIG_WIDTH_IN * dpi)
+        # Extent of what is actually shown (cropped edges excluded)
+        shown_width = array.shape[1] * f * spacing[0]
+        shown_height = array.shape[0] * f * spacing[1]
+
+        # Plotting; constrained layout sizes margins in absolute units, so the
+        # title/labels/colorbar fit whatever the projection's aspect ratio
+        fig = Figure(figsize=(FIG_WIDTH_IN, FIG_WIDTH_IN * (phys_height / phys_width)),
+                     layout="constrained")
+        FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        im = ax.imshow(array, cmap='gray', origin='lower', interpolation='nearest',
+                       extent=[0, shown_width, 0, shown_height])
+        fig.colorbar(im, ax=ax, label='Counts')
+        ax.set_title(f"Projection: {mhd_path.name}")
+        ax.set_xlabel("X (mm)")
+        ax.set_ylabel("Y (mm)")
+
+        fig.savefig(output_filename, dpi=dpi,
+                    pil_kwargs={'compress_level': PNG_COMPRESS_LEVEL})
         print(f"Saved PNG to {output_filename}")
-        plt.close()
 
     except Exception as e:
         print(f"Error converting {mhd_filename}: {e}")
         # Fallback: Try reading raw file directly if ITK fails
         try:
             print("Attempting fallback raw read...")
-            raw_filename = os.path.splitext(mhd_filename)[0] + ".raw"
-            if not os.path.exists(raw_filename):
+            raw_filename = str(mhd_path.with_suffix(".raw"))
+            # One stat gives both existence and size
+            try:
+                raw_size = os.stat(raw_filename).st_size
+            except FileNotFoundError:
                 print(f"Raw file {raw_filename} not found.")
                 return
             
@@ -67,43 +193,98 @@ def convert_mhd_to_png(mhd_filename, output_filename=None):
             dim_x, dim_y = 128, 128 # Default from geometry_3.py
             dtype = np.float32
             
+            have_dim = have_type = False
             with open(mhd_filename, 'r') as f:
                 for line in f:
-                    if line.startswith('DimSize'):
-                        parts = line.split('=')[1].strip().split()
+                    key, _, val = line.partition('=')
+                    key = key.strip()
+                    if key == 'DimSize':
+                        parts = val.split()
                         dim_x = int(parts[0])
                         dim_y = int(parts[1])
-                    if line.startswith('ElementType'):
-                        if 'MET_FLOAT' in line: dtype = np.float32
-                        elif 'MET_DOUBLE' in line: dtype = np.float64
-                        elif 'MET_SHORT' in line: dtype = np.int16
-            
-            data = np.fromfile(raw_filename, dtype=dtype)
-            if data.size != dim_x * dim_y:
-                print(f"Warning: Data size {data.size} does not match dimensions {dim_x}x{dim_y}. Reshaping might fail.")
+                        have_dim = True
+                    elif key == 'ElementType':
+                        dtype = MET_DTYPES.get(val.strip(), dtype)
+                        have_type = True
+                    # Only these two fields are needed; stop reading early
+                    if have_dim and have_type:
+                        break
             
-            array = data.reshape((dim_y, dim_x))
-            
-            plt.figure()
-            plt.imshow(array, cmap='gray', origin='lower')
-            plt.colorbar()
-            plt.title(f"Projection (Raw): {os.path.basename(mhd_filename)}")
-            plt.savefig(output_filename)
+            n_elements = raw_size // np.dtype(dtype).itemsize
+            if n_elements != dim_x * dim_y:
+                # Refuse rather than map just the first dim_x*dim_y elements
+                # (e.g. a multi-slice DimSize would silently show slice 0)
+                raise ValueError(f"Data size {n_elements} does not match dimensions {dim_x}x{dim_y}.")
+
+            # Map the file read-only instead of loading it; pages are read on demand
+            array = np.memmap(raw_filename, dtype=dtype, mode='r', shape=(dim_y, dim_x))
+            # The normalization kernel walks rows in C order; a reshaped memmap
+            # already is C-contiguous, so check rather than silently copy
+            assert array.flags.c_contiguous
+
+            if raw:
+                write_png_direct(array, output_filename, lut)
+                print(f"Saved PNG (raw, fallback) to {output_filename}")
+                return
+
+            fig = Figure(layout="constrained")
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            # Normalize once here so imshow does not redo it on the float data
+            u8 = normalize_to_uint8(array)
+            ax.imshow(u8, cmap='gray', origin='lower', vmin=0, vmax=255)
+            # Colorbar in data units, not the 0-255 codes that were drawn
+            data_norm = Normalize(float(array.min()), float(array.max()))
+            fig.colorbar(ScalarMappable(norm=data_norm, cmap='gray'), ax=ax, label='Counts')
+            ax.set_title(f"Projection (Raw): {mhd_path.name}")
+            fig.savefig(output_filename,
+                        pil_kwargs={'compress_level': PNG_COMPRESS_LEVEL})
             print(f"Saved PNG (fallback) to {output_filename}")
-            plt.close()
             
         except Exception as e2:
             print(f"Fallback failed: {e2}")
 
+def convert_many(files, raw=False, lut=None, dpi=SAVE_DPI):
+    """Convert several MHD files, one worker process per file (up to cpu_count)."""
+    convert = partial(convert_mhd_to_png, raw=raw, lut=lut, dpi=dpi)
+    if len(files) > 1:
+        # Processes rather than threads: ITK readers are not thread-safe
+        with multiprocessing.Pool(min(os.cpu_count() or 1, len(files))) as pool:
+            pool.map(convert, files)
+    else:
+        for f in files:
+            convert(f)
+
+
+USAGE = "Usage: python convert_mhd_to_png.py [--raw] [--dpi N] <file1.mhd> [file2.mhd ...]"
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python convert_mhd_to_png.py <file1.mhd> [file2.mhd ...]")
+    # --raw: plain grayscale PNG via PIL (no axes/colorbar), much faster in bulk
+    args = sys.argv[1:]
+    raw = "--raw" in args
+    args = [a for a in args if a != "--raw"]
+    # --dpi N: lower resolution for faster batch jobs
+    dpi = SAVE_DPI
+    if "--dpi" in args:
+        i = args.index("--dpi")
+        try:
+            dpi = int(args[i + 1])
+        except (IndexError, ValueError):
+            dpi = 0
+        if dpi <= 0:
+            print("Error: --dpi needs a positive integer value.")
+            print(USAGE)
+            sys.exit(2)
+        del args[i:i + 2]
+
+    if not args:
+        print(USAGE)
         # Auto-find mhd files in current directory if no args
-        files = [f for f in os.listdir('.') if f.endswith('.mhd')]
+        with os.scandir('.') as it:
+            files = [e.name for e in it if e.name.endswith('.mhd') and e.is_file()]
         if files:
             print(f"Found {len(files)} .mhd files in current directory. Converting...")
-            for f in files:
-                convert_mhd_to_png(f)
+            convert_many(files, raw=raw, dpi=dpi)
     else:
-        for f in sys.argv[1:]:
-            convert_mhd_to_png(f)
\ No newline at end of file
+        convert_many(args, raw=raw, dpi=dpi)
@@ -19,8 +19,8 @@ Author: Claude
 Date: 2025-11-21
 """
 
-import opengate as gate
 import click
+import copy
 import json
 from pathlib import Path
 
@@ -36,15 +36,20 @@ def example_default_configuration():
     """
     Example 1: Create GAGG SPECT simulation with default parameters
     """
+    import opengate as gate  # deferred: multi-second import
+
     print("\n" + "="*70)
     print("Example 1: Default GAGG SPECT Configuration")
     print("="*70)
 
+    # Units (resolved once)
+    g4u = gate.g4_units
+    cm, keV, Bq, second = g4u.cm, g4u.keV, g4u.Bq, g4u.second
+
     # Create simulation
     sim = gate.Simulation()
 
     # World
-    cm = gate.g4_units.cm
     sim.world.size = [100 * cm, 100 * cm, 100 * cm]
     sim.world.material = "G4_AIR"
 
@@ -74,10 +79,6 @@ def example_default_configuration():
     print(f"✅ Added digitizers for {len(crystals)} heads")
 
     # Add simple point source
-    keV = gate.g4_units.keV
-    Bq = gate.g4_units.Bq
-    mm = gate.g4_units.mm
-
     source = sim.add_source("GenericSource", "tc99m")
     source.particle = "gamma"
     source.energy.mono = 140.5 * keV
@@ -91,7 +92,7 @@ def example_default_configuration():
     sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
 
     # Timing
-    sim.run_timing_intervals = [[0, 60 * gate.g4_units.second]]
+    sim.run_timing_intervals = [[0, 60 * second]]
 
     print("\n✅ Simulation configured (60 second acquisition)")
 
@@ -106,12 +107,15 @@ def example_custom_crystal_size():
     """
     Example 2: Modify crystal dimensions programmatically
     """
+    import opengate as gate  # deferred: multi-second import
+
     print("\n" + "="*70)
     print("Example 2: Custom Crystal Dimensions")
     print("="*70)
 
-    # Load default parameters
-    params = gagg.get_geometrical_parameters()
+    # Copy the (cached) default parameters so the edits below do not leak
+    # into other examples sharing the same parameter object
+    params = copy.deepcopy(gagg.get_geometrical_parameters())
 
     # Modify crystal dimensions
     params.crystal_size_x_mm = 2.0  # 2mm instead of 3mm
@@ -159,6 +163,8 @@ def example_different_fov(fov_preset="small_animal"):
     """
     Example 3: Use different FOV presets
     """
+    import opengate as gate  # deferred: multi-second import
+
     print("\n" + "="*70)
     print(f"Example 3: FOV Configuration - {fov_preset}")
     print("="*70)
@@ -167,28 +173,32 @@ def example_different_fov(fov_preset="small_animal"):
 
     # Display FOV info
     fov_config = params.fov_presets[fov_preset]
+    # Bind the preset fields once (Box attribute access is not free)
+    fov_radius_cm = fov_config.fov_radius_cm
+    fov_height_cm = fov_config.fov_height_cm
+    detector_radius_cm = fov_config.detector_radius_cm
     print(f"\n🎯 FOV Configuration: {fov_config.description}")
-    print(f"   Diameter: {fov_config.fov_radius_cm * 2} cm")
-    print(f"   Height: {fov_config.fov_height_cm} cm")
-    print(f"   Detector radius: {fov_config.detector_radius_cm} cm")
+    print(f"   Diameter: {fov_radius_cm * 2} cm")
+    print(f"   Height: {fov_height_cm} cm")
+    print(f"   Detector radius: {detector_radius_cm} cm")
 
     # Create simulation
     sim = gate.Simulation()
     cm = gate.g4_units.cm
-    world_size = max(200 * cm, fov_config.detector_radius_cm * 3 * cm)
+    world_size = max(200 * cm, detector_radius_cm * 3 * cm)
     sim.world.size = [world_size, world_size, world_size]
     sim.world.material = "G4_AIR"
 
     # Add FOV phantom (water cylinder for reference)
     fov = sim.add_volume("Cylinder", "FOV")
-    fov.rmax = fov_config.fov_radius_cm * cm
+    fov.rmax = fov_radius_cm * cm
     fov.rmin = 0
-    fov.height = fov_config.fov_height_cm * cm
+    fov.height = fov_height_cm * cm
     fov.material = "G4_WATER"
     fov.color = [0, 1, 1, 0.2]
     fov.translation = [0, 0, 0]
 
-    print(f"✅ Added FOV phantom (Ø{fov_config.fov_radius_cm * 2} cm × {fov_config.fov_height_cm} cm)")
+    print(f"✅ Added FOV phantom (Ø{fov_radius_cm * 2} cm × {fov_height_cm} cm)")
 
     # Add detector heads
     heads, crystals = gagg.add_gagg_spect_heads(
@@ -198,7 +208,7 @@ def example_different_fov(fov_preset="small_animal"):
         fov_preset=fov_preset
     )
 
-    print(f"✅ Added {len(heads)} detector heads at {fov_config.detector_radius_cm} cm radius")
+    print(f"✅ Added {len(heads)} detector heads at {detector_radius_cm} cm radius")
 
     return sim
 
@@ -211,6 +221,8 @@ def example_parallel_collimator():
     """
     Example 4: Use parallel-hole collimator instead of pinhole
     """
+    import opengate as gate  # deferred: multi-second import
+
     print("\n" + "="*70)
     print("Example 4: Parallel-Hole Collimator Configuration")
     print("="*70)
@@ -300,8 +312,9 @@ def example_save_custom_config():
 
     # Save to file
     output_file = "gagg_spect_custom_parameters.json"
+    # Serialize in one go and write once (json.dump with indent issues a write per token)
     with open(output_file, "w") as f:
-        json.dump(custom_config, f, indent=2)
+        f.write(json.dumps(custom_config, indent=2))
 
     print(f"\n💾 Saved custom configuration to: {output_file}")
     print(f"\n📐 Custom specifications:")
@@ -312,13 +325,85 @@ def example_save_custom_config():
     print(f"   Energy resolution: {custom_config['energy_resolution_fwhm']*100}%")
 
     print(f"\nTo use this configuration:")
-    print(f'  params_file = "{output_file}"')
-    print(f'  with open(params_file) as f:')
-    print(f'      custom_params = json.load(f)')
-    print(f'      custom_params = Box(custom_params)')
+    print(f'  custom_params = gagg.load_geometrical_parameters("{output_file}")')
     print(f'  gagg.add_gagg_spect_heads(sim, params=custom_params)')
 
 
+# ==============================================================================
+# Simulation Builder
+# ==============================================================================
+
+def build_simulation(preset="small_animal", heads=3, collimator="pinhole", params=None):
+    """
+    Build the CLI simulation (FOV phantom, heads, digitizers, source)
+
+    Parameters come from the cached default parameters unless given, so
+    building several simulations only re-creates the Simulation object.
+
+    Returns:
+    --------
+    tuple : (sim, params)
+    """
+    import opengate as gate
+
+    if params is None:
+        params = gagg.get_geometrical_parameters()
+
+    # Create simulation
+    sim = gate.Simulation()
+    g4u = gate.g4_units
+    cm, keV, Bq, second = g4u.cm, g4u.keV, g4u.Bq, g4u.second
+
+    # Get FOV config for world size
+    fov_config = params.fov_presets[preset]
+    world_size = max(200 * cm, fov_config.detector_radius_cm * 3 * cm)
+    sim.world.size = [world_size, world_size, world_size]
+    sim.world.material = "G4_AIR"
+
+    # Add FOV phantom
+    fov = sim.add_volume("Cylinder", "FOV")
+    fov.rmax = fov_config.fov_radius_cm * cm
+    fov.rmin = 0
+    fov.height = fov_config.fov_height_cm * cm
+    fov.material = "G4_WATER"
+    fov.color = [0, 1, 1, 0.2]
+
+    # Add detector heads
+    heads_list, crystals = gagg.add_gagg_spect_heads(
+        sim,
+        number_of_heads=heads,
+        collimator_type=collimator,
+        fov_preset=preset,
+        params=params
+    )
+
+    # Add digitizers
+    for i, crystal in enumerate(crystals):
+        gagg.add_gagg_digitizer(
+            sim,
+            crystal.name,
+            name=f"head_{i}",
+            params=params,
+            output_filename=f"output/gagg_head_{i}"
+        )
+
+    # Add source
+    source = sim.add_source("GenericSource", "tc99m")
+    source.particle = "gamma"
+    source.energy.mono = 140.5 * keV
+    source.activity = 1e6 * Bq
+    source.position.type = "point"
+    source.direction.type = "iso"
+
+    # Physics
+    sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
+
+    # Timing
+    sim.run_timing_intervals = [[0, 60 * second]]
+
+    return sim, params
+
+
 # ==============================================================================
 # Main CLI
 # ==============================================================================
@@ -395,57 +480,7 @@ def main(preset, heads, collimator, custom, save_config, run, visu):
         print(f"   Crystal: {params.crystal_size_x_mm} × {params.crystal_size_y_mm} × {params.crystal_thickness_mm} mm")
         print(f"   Array: {params.crystal_array_size_x} × {params.crystal_array_size_y}")
 
-        # Create simulation
-        sim = gate.Simulation()
-        cm = gate.g4_units.cm
-
-        # Get FOV config for world size
-        fov_config = params.fov_presets[preset]
-        world_size = max(200 * cm, fov_config.detector_radius_cm * 3 * cm)
-        sim.world.size = [world_size, world_size, world_size]
-        sim.world.material = "G4_AIR"
-
-        # Add FOV phantom
-        fov = sim.add_volume("Cylinder", "FOV")
-        fov.rmax = fov_config.fov_radius_cm * cm
-        fov.rmin = 0
-        fov.height = fov_config.fov_height_cm * cm
-        fov.material = "G4_WATER"
-        fov.color = [0, 1, 1, 0.2]
-
-        # Add detector heads
-        heads_list, crystals = gagg.add_gagg_spect_heads(
-            sim,
-            number_of_heads=heads,
-            collimator_type=collimator,
-            fov_preset=preset
-        )
-
-        # Add digitizers
-        for i, crystal in enumerate(crystals):
-            gagg.add_gagg_digitizer(
-                sim,
-                crystal.name,
-                name=f"head_{i}",
-                output_filename=f"output/gagg_head_{i}"
-            )
-
-        # Add source
-        keV = gate.g4_units.keV
-        Bq = gate.g4_units.Bq
-
-        source = sim.add_source("GenericSource", "tc99m")
-        source.particle = "gamma"
-        source.energy.mono = 140.5 * keV
-        source.activity = 1e6 * Bq
-        source.position.type = "point"
-        source.direction.type = "iso"
-
-        # Physics
-        sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
-
-        # Timing
-        sim.run_timing_intervals = [[0, 60 * gate.g4_units.second]]
+        sim, params = build_simulation(preset, heads, collimator, params)
 
         print(f"\n✅ Simulation configured successfully!")
 
@@ -12,25 +12,48 @@ Author: Claude
 Date: 2025-11-21
 """
 
+import copy
 import json
-import opengate as gate
+import os
+import sys
+from collections import namedtuple
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from box import Box
 import math
-import numpy as np
-from scipy.spatial.transform import Rotation
-from opengate.geometry.volumes import RepeatParametrisedVolume, HexagonVolume
+
+# opengate and numpy are imported inside the functions that build
+# geometry, so reading parameters (e.g. --save-config) stays cheap
+
+try:
+    import orjson  # Optional faster JSON parser
+except ImportError:
+    orjson = None
 
 # ==============================================================================
 # Geometrical Parameters
 # ==============================================================================
 
+# Hexagonal close-pack row spacing factor
+SQRT3 = math.sqrt(3.0)
+
+GEOMETRICAL_PARAMETERS_FILENAME = Path(__file__).parent / "gagg_spect_geometrical_parameters.json"
+
 geometrical_parameters = None
 
 
+def _read_json(filename):
+    """Parse a JSON file, using orjson when it is installed"""
+    if orjson is None:
+        with open(filename) as json_file:
+            return json.load(json_file)
+    return orjson.loads(Path(filename).read_bytes())
+
+
 def get_geometrical_parameters_filename():
     """Get path to geometric parameters JSON file"""
-    return Path(__file__).parent / "gagg_spect_geometrical_parameters.json"
+    return GEOMETRICAL_PARAMETERS_FILENAME
 
 
 def get_geometrical_parameters():
@@ -43,14 +66,38 @@ def get_geometrical_parameters():
     """
     global geometrical_parameters
     if geometrical_parameters is None:
-        filename = get_geometrical_parameters_filename()
-        with open(filename) as json_file:
-            geometrical_parameters = json.load(json_file)
-            geometrical_parameters = Box(geometrical_parameters)
+        geometrical_parameters = Box(_read_json(GEOMETRICAL_PARAMETERS_FILENAME))
     return geometrical_parameters
 
 
-def get_default_size_and_spacing(fov_preset="small_animal"):
+@lru_cache(maxsize=32)
+def _load_parameters_cached(path, mtime_ns):
+    """Parse a parameter file; cache key includes mtime so edits are picked up"""
+    return Box(_read_json(path))
+
+
+def load_geometrical_parameters(filename):
+    """
+    Load geometric parameters from a custom JSON file
+
+    Parsed files are cached by (path, modification time), so reloading an
+    unchanged preset does not re-read it.
+
+    Parameters:
+    -----------
+    filename : str or Path
+        Path to a parameters JSON file (same layout as the default one)
+
+    Returns:
+    --------
+    Box : Independent copy of the parameters, safe to modify
+    """
+    path = str(Path(filename).resolve())
+    mtime_ns = os.stat(path).st_mtime_ns
+    return copy.deepcopy(_load_parameters_cached(path, mtime_ns))
+
+
+def get_default_size_and_spacing(fov_preset="small_animal", params=None):
     """
     Get default projection size and spacing based on detector array
 
@@ -58,12 +105,15 @@ def get_default_size_and_spacing(fov_preset="small_animal"):
     -----------
     fov_preset : str
         FOV preset name (small_animal, medium, large_clinical)
+    params : Box
+        Geometric parameters (if None, uses default from JSON)
 
     Returns:
     --------
     tuple : (size, spacing) where size is [nx, ny] and spacing is [sx, sy] in mm
     """
-    params = get_geometrical_parameters()
+    if params is None:
+        params = get_geometrical_parameters()
 
     # Size matches crystal array
     size = [params.crystal_array_size_x, params.crystal_array_size_y]
@@ -79,6 +129,13 @@ def get_default_size_and_spacing(fov_preset="small_animal"):
 # Materials
 # ==============================================================================
 
+@lru_cache(maxsize=None)
+def get_materials_database_filename():
+    """Path (str) of the local GateMaterials.db, or None if absent; probed once"""
+    materials_db = Path(__file__).parent / "GateMaterials.db"
+    return str(materials_db) if materials_db.exists() else None
+
+
 def add_materials(sim):
     """
     Add materials required for GAGG SPECT detector
@@ -88,12 +145,13 @@ def add_materials(sim):
     sim : gate.Simulation
         OpenGATE simulation object
     """
-    # Check for local GateMaterials.db
-    materials_db = Path(__file__).parent / "GateMaterials.db"
+    # Check for local GateMaterials.db (called once per head, so the
+    # filesystem probe is cached)
+    materials_db = get_materials_database_filename()
 
-    if materials_db.exists():
-        if str(materials_db) not in sim.volume_manager.material_database.filenames:
-            sim.volume_manager.add_material_database(str(materials_db))
+    if materials_db is not None:
+        if materials_db not in sim.volume_manager.material_database.filenames:
+            sim.volume_manager.add_material_database(materials_db)
     else:
         # Use default GATE materials (basic materials should be available)
         pass
@@ -103,12 +161,92 @@ def add_materials(sim):
 # Detector Geometry
 # ==============================================================================
 
+# Visualization colors (RGBA); immutable so every head can share them
+COLOR_HEAD = (1, 1, 1, 0.1)             # white
+COLOR_SHIELDING = (0.1, 0.1, 0.1, 1)    # gray
+COLOR_INTERIOR = (1, 0, 0, 0.3)         # red
+COLOR_BACKSIDE = (0.5, 0.5, 1, 0.8)     # blue
+COLOR_CRYSTAL_MODULE = (1, 1, 0, 0.3)   # yellow
+COLOR_CRYSTAL = (0, 1, 0, 0.8)          # green
+COLOR_COLLIMATOR = (1, 0.7, 0.7, 1)     # pink
+COLOR_PINHOLE = (0, 0, 1, 0.5)
+COLOR_HOLE = (0, 0, 0, 0)               # invisible
+
+# Head dimensions (G4 units) derived from the parameters; identical for every
+# head of a ring, so add_gagg_spect_heads computes it once and reuses it
+_HeadSpec = namedtuple("_HeadSpec", [
+    "detector_x", "detector_y", "head_size", "shielding_size", "shielding_z",
+    "interior_size", "interior_z", "backside_size", "backside_z",
+])
+
+
+def _head_spec(params):
+    """
+    Compute the head, shielding, interior and backside dimensions
+
+    Parameters:
+    -----------
+    params : Box
+        Geometric parameters
+
+    Returns:
+    --------
+    _HeadSpec : Sizes and z offsets in G4 units
+    """
+    import opengate as gate
+
+    mm = gate.g4_units.mm
+
+    detector_x = params.detector_size_x_mm * mm
+    detector_y = params.detector_size_y_mm * mm
+
+    collimator_thickness = params.collimator_thickness_mm * mm
+    crystal_thickness = params.crystal_thickness_mm * mm
+    backside_thickness = params.backside_thickness_mm * mm
+    shielding_thickness = params.shielding_thickness_mm * mm
+
+    head_depth = (
+        collimator_thickness +
+        crystal_thickness +
+        backside_thickness +
+        shielding_thickness * 2
+    )
+
+    head_size_x = detector_x + 10 * mm
+    head_size_y = detector_y + 10 * mm
+
+    shielding_depth = head_depth - collimator_thickness - 5 * mm
+    shielding_size = [head_size_x - 5 * mm, head_size_y - 5 * mm, shielding_depth]
+
+    interior_size = [
+        shielding_size[0] - 2 * shielding_thickness,
+        shielding_size[1] - 2 * shielding_thickness,
+        shielding_size[2] - shielding_thickness,  # Back wall only
+    ]
+
+    crystal_module_z = interior_size[2] / 2 - crystal_thickness / 2
+    backside_z = crystal_module_z - crystal_thickness / 2 - backside_thickness / 2
+
+    return _HeadSpec(
+        detector_x=detector_x,
+        detector_y=detector_y,
+        head_size=[head_size_x, head_size_y, head_depth],
+        shielding_size=shielding_size,
+        shielding_z=-head_depth / 2 + shielding_depth / 2,
+        interior_size=interior_size,
+        interior_z=shielding_thickness / 2,
+        backside_size=[detector_x, detector_y, backside_thickness],
+        backside_z=backside_z,
+    )
+
+
 def add_spect_head(
     sim,
     name="gagg_spect",
     collimator_type="pinhole",
     debug=False,
-    params=None
+    params=None,
+    spec=None
 ):
     """
     Create GAGG SPECT detector head geometry
@@ -125,6 +263,8 @@ def add_spect_head(
         Enable debug mode with reduced geometry
     params : dict
         Override parameters (if None, uses default from JSON)
+    spec : _HeadSpec
+        Precomputed head dimensions (if None, computed from params)
 
     Returns:
     --------
@@ -132,45 +272,17 @@ def add_spect_head(
     """
     if params is None:
         params = get_geometrical_parameters()
-
-    mm = gate.g4_units.mm
-    cm = gate.g4_units.cm
+    if spec is None:
+        spec = _head_spec(params)
 
     # Add materials
     add_materials(sim)
 
-    # Calculate dimensions
-    detector_x = params.detector_size_x_mm * mm
-    detector_y = params.detector_size_y_mm * mm
-
-    collimator_thickness = params.collimator_thickness_mm * mm
-    crystal_thickness = params.crystal_thickness_mm * mm
-    backside_thickness = params.backside_thickness_mm * mm
-    shielding_thickness = params.shielding_thickness_mm * mm
-
-    head_depth = (
-        collimator_thickness +
-        crystal_thickness +
-        backside_thickness +
-        shielding_thickness * 2
-    )
-
-    head_size_x = detector_x + 10 * mm
-    head_size_y = detector_y + 10 * mm
-
-    # Colors
-    white = [1, 1, 1, 0.1]
-    gray = [0.1, 0.1, 0.1, 1]
-    yellow = [1, 1, 0, 0.8]
-    blue = [0.5, 0.5, 1, 0.8]
-    green = [0, 1, 0, 0.8]
-    red = [1, 0, 0, 0.3]
-
     # 1. Main head box
     head = sim.add_volume("Box", name)
     head.material = "G4_AIR"
-    head.size = [head_size_x, head_size_y, head_depth]
-    head.color = white
+    head.size = list(spec.head_size)
+    head.color = COLOR_HEAD
 
     # 2. Collimator (at front)
     if collimator_type:
@@ -186,24 +298,18 @@ def add_spect_head(
     # 3. Lead shielding box
     shielding = sim.add_volume("Box", f"{name}_shielding")
     shielding.mother = head.name
-    shielding_depth = head_depth - collimator_thickness - 5 * mm
-    shielding.size = [head_size_x - 5 * mm, head_size_y - 5 * mm, shielding_depth]
-    shielding_z = -head_depth / 2 + shielding_depth / 2
-    shielding.translation = [0, 0, shielding_z]
+    shielding.size = list(spec.shielding_size)
+    shielding.translation = [0, 0, spec.shielding_z]
     shielding.material = params.shielding_material
-    shielding.color = gray
+    shielding.color = COLOR_SHIELDING
 
     # 4. Shielding interior (air cavity)
     interior = sim.add_volume("Box", f"{name}_interior")
     interior.mother = shielding.name
-    interior.size = [
-        shielding.size[0] - 2 * shielding_thickness,
-        shielding.size[1] - 2 * shielding_thickness,
-        shielding.size[2] - shielding_thickness,  # Back wall only
-    ]
-    interior.translation = [0, 0, shielding_thickness / 2]
+    interior.size = list(spec.interior_size)
+    interior.translation = [0, 0, spec.interior_z]
     interior.material = "G4_AIR"
-    interior.color = red
+    interior.color = COLOR_INTERIOR
 
     # 5. Crystal (sensitive detector)
     crystal = add_crystal(sim, name, interior, params, debug)
@@ -211,12 +317,10 @@ def add_spect_head(
     # 6. Backside (PMT/Electronics)
     backside = sim.add_volume("Box", f"{name}_backside")
     backside.mother = interior.name
-    backside.size = [detector_x, detector_y, backside_thickness]
-    crystal_module_z = interior.size[2] / 2 - crystal_thickness / 2
-    backside_z = crystal_module_z - crystal_thickness / 2 - backside.size[2] / 2
-    backside.translation = [0, 0, backside_z]
+    backside.size = list(spec.backside_size)
+    backside.translation = [0, 0, spec.backside_z]
     backside.material = params.backside_material
-    backside.color = blue
+    backside.color = COLOR_BACKSIDE
 
     return head, collimator, crystal
 
@@ -240,8 +344,12 @@ def add_crystal(sim, head_name, parent_volume, params, debug=False):
 
     Returns:
     --------
-    Volume : Crystal volume
+    Volume : Crystal prototype Box. Attach digitizers to it: the repeated
+        copies (volume "<head>_crystal_param") share its logical volume
     """
+    import opengate as gate
+    from opengate.geometry.volumes import RepeatParametrisedVolume
+
     mm = gate.g4_units.mm
 
     # Crystal dimensions
@@ -271,7 +379,7 @@ def add_crystal(sim, head_name, parent_volume, params, debug=False):
     module_z = parent_volume.size[2] / 2 - module.size[2] / 2
     module.translation = [0, 0, module_z]
     module.material = "G4_AIR"
-    module.color = [1, 1, 0, 0.3]
+    module.color = COLOR_CRYSTAL_MODULE
 
     # Individual crystal (will be repeated)
     crystal_name = f"{head_name}_crystal"
@@ -279,15 +387,19 @@ def add_crystal(sim, head_name, parent_volume, params, debug=False):
     crystal.mother = module.name
     crystal.size = [crystal_x, crystal_y, crystal_z]
     crystal.material = params.crystal_material
-    crystal.color = [0, 1, 0, 0.8]
+    crystal.color = COLOR_CRYSTAL
+    crystal.build_physical_volume = False  # Prototype for repeater
 
-    # Repeat array
-    repeat = gate.geometry.utility.repeat_array(
-        repeat_vector=[pitch_x, pitch_y, 0],
-        repeat_number=[array_nx, array_ny, 1]
-    )
-    crystal.repeaters.append(repeat)
+    # Repeat array: one parametrised volume for the whole nx x ny grid,
+    # centred in the module (as for the parallel collimator holes)
+    crystalp = RepeatParametrisedVolume(repeated_volume=crystal, name=f"{crystal_name}_param")
+    crystalp.linear_repeat = [array_nx, array_ny, 1]
+    crystalp.translation = [pitch_x, pitch_y, 0]
 
+    sim.volume_manager.add_volume(crystalp)
+
+    # The prototype owns the G4 logical volume that sensitive detectors are
+    # registered on; the parametrised volume only has a physical volume
     return crystal
 
 
@@ -310,7 +422,10 @@ def add_pinhole_collimator(sim, head_name, head_volume, params):
     --------
     Volume : Collimator volume
     """
-    mm = gate.g4_units.mm
+    import opengate as gate
+
+    g4u = gate.g4_units
+    mm, deg = g4u.mm, g4u.deg
 
     detector_x = params.detector_size_x_mm * mm
     detector_y = params.detector_size_y_mm * mm
@@ -326,7 +441,7 @@ def add_pinhole_collimator(sim, head_name, head_volume, params):
     colli_z = head_volume.size[2] / 2 - collimator.size[2] / 2 - 0.5 * mm
     collimator.translation = [0, 0, colli_z]
     collimator.material = params.collimator_material
-    collimator.color = [1, 0.7, 0.7, 1]
+    collimator.color = COLOR_COLLIMATOR
 
     # Pinhole aperture (conical section)
     pinhole = sim.add_volume("Cons", f"{head_name}_pinhole")
@@ -335,15 +450,15 @@ def add_pinhole_collimator(sim, head_name, head_volume, params):
     pinhole.rmax1 = params.pinhole_diameter_mm / 2.0 * mm
     pinhole.rmin2 = 0
     # Exit diameter based on opening angle
-    opening_angle_rad = np.deg2rad(params.pinhole_opening_angle_deg)
-    exit_radius = params.pinhole_diameter_mm / 2.0 + thickness * np.tan(opening_angle_rad / 2)
+    opening_angle_rad = math.radians(params.pinhole_opening_angle_deg)
+    exit_radius = params.pinhole_diameter_mm / 2.0 + thickness * math.tan(opening_angle_rad / 2)
     pinhole.rmax2 = exit_radius * mm
     pinhole.dz = thickness / 2.0  # Cons uses half-length
     pinhole.sphi = 0
-    pinhole.dphi = 360 * gate.g4_units.deg
+    pinhole.dphi = 360 * deg
     pinhole.translation = [0, 0, 0]
     pinhole.material = "G4_AIR"
-    pinhole.color = [0, 0, 1, 0.5]
+    pinhole.color = COLOR_PINHOLE
 
     return collimator
 
@@ -369,6 +484,9 @@ def add_parallel_collimator(sim, head_name, head_volume, params, debug=False):
     --------
     Volume : Collimator volume
     """
+    import opengate as gate
+    from opengate.geometry.volumes import RepeatParametrisedVolume
+
     mm = gate.g4_units.mm
 
     detector_x = params.detector_size_x_mm * mm
@@ -385,22 +503,23 @@ def add_parallel_collimator(sim, head_name, head_volume, params, debug=False):
     colli_z = head_volume.size[2] / 2 - collimator.size[2] / 2 - 0.5 * mm
     collimator.translation = [0, 0, colli_z]
     collimator.material = params.collimator_material
-    collimator.color = [1, 0.7, 0.7, 1]
+    collimator.color = COLOR_COLLIMATOR
 
     # Hexagonal holes (repeated pattern)
     hole_name = f"{head_name}_colli_hole"
     hole = sim.add_volume("Hexagon", hole_name)
     hole.mother = colli_name
     hole.height = hole_length
-    hole.radius = params.parallel_hole_diameter_mm / 2.0 * mm
+    hole_radius = params.parallel_hole_diameter_mm / 2.0 * mm
+    hole.radius = hole_radius
     hole.material = "G4_AIR"
-    hole.color = [0, 0, 0, 0]
+    hole.color = COLOR_HOLE
     hole.build_physical_volume = False  # Prototype for repeater
 
     # Hexagonal close-pack pattern
     septa = params.parallel_septa_thickness_mm * mm
-    step_x = 3.0 * hole.radius + 2.0 * septa
-    step_y = math.sqrt(3) * hole.radius + 2.0 * septa
+    step_x = 3.0 * hole_radius + 2.0 * septa
+    step_y = SQRT3 * hole_radius + 2.0 * septa
 
     if debug:
         nx, ny = 10, 10
@@ -425,6 +544,46 @@ def add_parallel_collimator(sim, head_name, head_volume, params, debug=False):
 # Multi-Head Setup
 # ==============================================================================
 
+# Head angles (deg) around the ring: HEAD_ANGLES[number_of_heads] -> tuple.
+# Read-only, since _head_ring_layout caches what it derives from it; the
+# HEAD_ANGLES[n] lookup for n = 1-4 is the stable public form
+HEAD_ANGLES = MappingProxyType({
+    1: (0.0,),
+    2: (0.0, 180.0),
+    3: (0.0, 120.0, 240.0),
+    4: (0.0, 90.0, 180.0, 270.0),
+})
+
+
+@lru_cache(maxsize=None)
+def _head_ring_layout(number_of_heads):
+    """
+    Unit ring directions and rotation matrices for a given number of heads
+
+    Only depends on the head count, so it is computed once per count and
+    shared (arrays are read-only).
+
+    Returns:
+    --------
+    tuple : (cos, sin, rotations) with shapes (n,), (n,), (n, 3, 3)
+    """
+    import numpy as np
+
+    angles_rad = np.deg2rad(np.asarray(HEAD_ANGLES[number_of_heads]))
+    cos, sin = np.cos(angles_rad), np.sin(angles_rad)
+    # Rotation: point collimator toward center, i.e. about Z by angle + 180
+    # deg, whose cos/sin are (-cos, -sin)
+    rotations = np.zeros((len(angles_rad), 3, 3))
+    rotations[:, 0, 0] = -cos
+    rotations[:, 0, 1] = sin
+    rotations[:, 1, 0] = -sin
+    rotations[:, 1, 1] = -cos
+    rotations[:, 2, 2] = 1.0
+    for a in (cos, sin, rotations):
+        a.flags.writeable = False
+    return cos, sin, rotations
+
+
 def add_gagg_spect_heads(
     sim,
     number_of_heads=3,
@@ -455,6 +614,8 @@ def add_gagg_spect_heads(
     --------
     tuple : (list of heads, list of crystals)
     """
+    import opengate as gate
+
     if params is None:
         params = get_geometrical_parameters()
 
@@ -465,38 +626,31 @@ def add_gagg_spect_heads(
     detector_radius = fov_config.detector_radius_cm * cm
 
     # Head angles
-    if number_of_heads == 1:
-        angles = [0.0]
-    elif number_of_heads == 2:
-        angles = [0.0, 180.0]
-    elif number_of_heads == 3:
-        angles = [0.0, 120.0, 240.0]
-    elif number_of_heads == 4:
-        angles = [0.0, 90.0, 180.0, 270.0]
-    else:
+    if number_of_heads not in HEAD_ANGLES:
         raise ValueError(f"Number of heads must be 1-4, got {number_of_heads}")
 
+    # Ring positions and orientations for all heads at once
+    cos, sin, rotations = _head_ring_layout(number_of_heads)
+    # Plain Python floats for the translation lists handed to OpenGATE
+    xs = (detector_radius * cos).tolist()
+    ys = (detector_radius * sin).tolist()
+
+    # All heads share the same dimensions; compute them once
+    spec = _head_spec(params)
+
     heads = []
     crystals = []
 
-    for i, angle in enumerate(angles):
+    for i in range(number_of_heads):
         head_name = f"gagg_spect_head_{i}"
 
         # Create head
         head, collimator, crystal = add_spect_head(
-            sim, head_name, collimator_type, debug, params
+            sim, head_name, collimator_type, debug, params, spec
         )
 
-        # Position in ring
-        angle_rad = np.deg2rad(angle)
-        x = detector_radius * np.cos(angle_rad)
-        y = detector_radius * np.sin(angle_rad)
-
-        # Rotation: point collimator toward center
-        rot = Rotation.from_euler("z", angle + 180, degrees=True)
-
-        head.translation = [x, y, 0]
-        head.rotation = rot.as_matrix()
+        head.translation = [xs[i], ys[i], 0.0]
+        head.rotation = rotations[i].copy()
 
         heads.append(head)
         crystals.append(crystal)
@@ -535,6 +689,8 @@ def add_gagg_digitizer(
     --------
     Digitizer : Configured digitizer object
     """
+    import opengate as gate
+
     if params is None:
         params = get_geometrical_parameters()
 
@@ -544,8 +700,10 @@ def add_gagg_digitizer(
     keV = gate.g4_units.keV
     mm = gate.g4_units.mm
 
-    # Get projection parameters
-    size, spacing = get_default_size_and_spacing()
+    # Get projection parameters (from the params already resolved above)
+    size, spacing = get_default_size_and_spacing(params=params)
+    channel_min = params.energy_window_lower_keV * keV
+    channel_max = params.energy_window_upper_keV * keV
 
     # Hits collection
     hits = sim.add_actor("DigitizerHitsCollectionActor", f"{name}_hits")
@@ -579,8 +737,8 @@ def add_gagg_digitizer(
     ewin.channels = [
         {
             "name": channel_name,
-            "min": params.energy_window_lower_keV * keV,
-            "max": params.energy_window_upper_keV * keV,
+            "min": channel_min,
+            "max": channel_max,
         }
     ]
 
@@ -596,23 +754,44 @@ def add_gagg_digitizer(
 
 
 # ==============================================================================
-# Example Usage
+# Summary
 # ==============================================================================
 
-if __name__ == "__main__":
-    print("GAGG SPECT Detector Module")
-    print("=" * 70)
+def print_summary(params=None):
+    """
+    Print detector and FOV preset summary
+
+    Lines are collected and written to stdout in a single call.
+
+    Parameters:
+    -----------
+    params : Box
+        Geometric parameters (if None, uses default from JSON)
+    """
+    if params is None:
+        params = get_geometrical_parameters()
 
-    # Load parameters
-    params = get_geometrical_parameters()
-    print(f"\nDetector: {params.detector_name}")
-    print(f"Crystal: {params.crystal_size_x_mm} × {params.crystal_size_y_mm} × {params.crystal_thickness_mm} mm")
-    print(f"Array: {params.crystal_array_size_x} × {params.crystal_array_size_y}")
-    print(f"Collimator: {params.collimator_type}")
+    out = []
+    a = out.append
+    a("GAGG SPECT Detector Module")
+    a("=" * 70)
+    a(f"\nDetector: {params.detector_name}")
+    a(f"Crystal: {params.crystal_size_x_mm} × {params.crystal_size_y_mm} × {params.crystal_thickness_mm} mm")
+    a(f"Array: {params.crystal_array_size_x} × {params.crystal_array_size_y}")
+    a(f"Collimator: {params.collimator_type}")
 
-    print(f"\nFOV Presets:")
+    a("\nFOV Presets:")
     for preset_name, preset in params.fov_presets.items():
-        print(f"  {preset_name}: {preset.description}")
-        print(f"    Radius: {preset.fov_radius_cm} cm, Detector @ {preset.detector_radius_cm} cm")
+        a(f"  {preset_name}: {preset.description}")
+        a(f"    Radius: {preset.fov_radius_cm} cm, Detector @ {preset.detector_radius_cm} cm")
+
+    sys.stdout.write("\n".join(out) + "\n")
+
+
+# ==============================================================================
+# Example Usage
+# ==============================================================================
 
+if __name__ == "__main__":
+    print_summary()
     print("\nTo use this detector with SPECTConfig, see the example script.")
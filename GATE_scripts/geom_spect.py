@@ -11,12 +11,10 @@ Based on GE Discovery NM670 logic but scaled down for animal imaging.
 """
 
 import opengate as gate
-import opengate.contrib.spect.spect_helpers as spect_helpers
-from opengate.geometry.volumes import RepeatParametrisedVolume, HexagonVolume
-from opengate.geometry.utility import get_transform_orbiting
-from scipy.spatial.transform import Rotation
+from opengate.geometry.volumes import RepeatParametrisedVolume
+import numpy as np
+import os
 import pathlib
-import math
 import click
 
 
@@ -24,21 +22,38 @@ import click
 # CONFIGURATION
 # ==============================================================================
 
+# Geant4 units, resolved once at import
+cm = gate.g4_units.cm
+mm = gate.g4_units.mm
+keV = gate.g4_units.keV
+Bq = gate.g4_units.Bq
+second = gate.g4_units.second
+
 # Dimensions for Animal SPECT
-HEAD_SIZE_X = 20.0 * gate.g4_units.cm
-HEAD_SIZE_Y = 15.0 * gate.g4_units.cm
-HEAD_LENGTH = 15.0 * gate.g4_units.cm
+HEAD_SIZE_X = 20.0 * cm
+HEAD_SIZE_Y = 15.0 * cm
+HEAD_LENGTH = 15.0 * cm
 
-CRYSTAL_SIZE_X = 16.0 * gate.g4_units.cm
-CRYSTAL_SIZE_Y = 12.0 * gate.g4_units.cm
-CRYSTAL_THICKNESS = 0.9525 * gate.g4_units.cm  # 3/8 inch
+CRYSTAL_SIZE_X = 16.0 * cm
+CRYSTAL_SIZE_Y = 12.0 * cm
+CRYSTAL_THICKNESS = 0.9525 * cm  # 3/8 inch
 
-SHIELDING_THICKNESS = 0.5 * gate.g4_units.cm
+SHIELDING_THICKNESS = 0.5 * cm
 
 # Collimator parameters (High Resolution for small animals)
-COLLI_HOLE_RADIUS = 0.15 * gate.g4_units.cm  # 3.0mm diameter
-COLLI_SEPTA = 0.05 * gate.g4_units.cm
-COLLI_HEIGHT = 1.5 * gate.g4_units.cm
+COLLI_HOLE_RADIUS = 0.15 * cm  # 3.0mm diameter
+COLLI_SEPTA = 0.05 * cm
+COLLI_HEIGHT = 1.5 * cm
+
+# Hexagonal close-pack pitch of the two repeater grids (see add_animal_collimator)
+SQRT3 = 1.7320508075688772
+COLLI_STEP_X = 3.0 * COLLI_HOLE_RADIUS + 2.0 * COLLI_SEPTA
+COLLI_STEP_Y = SQRT3 * COLLI_HOLE_RADIUS + 2.0 * COLLI_SEPTA
+
+# Head orientations: rotations about X by -90 / +90 degrees, so the
+# collimator face (+Z in the head frame) points at the origin
+ROT_X_NEG90 = np.array([[1.0, 0.0, 0.0], [0.0, 0.0, 1.0], [0.0, -1.0, 0.0]])
+ROT_X_POS90 = ROT_X_NEG90.T.copy()
 
 # ==============================================================================
 # GEOMETRY FUNCTIONS
@@ -59,8 +74,6 @@ def add_animal_spect_head(sim, name="spect_head", collimator_type="lehr", debug=
     """
     Creates a single SPECT head scaled for animal imaging.
     """
-    cm = gate.g4_units.cm
-    mm = gate.g4_units.mm
     
     # Colors
     white = [1, 1, 1, 0.1]
@@ -135,8 +148,6 @@ def add_animal_collimator(sim, name, head, collimator_type, debug):
     """
     Adds a parallel hole collimator.
     """
-    cm = gate.g4_units.cm
-    mm = gate.g4_units.mm
     
     # Collimator Container
     colli_name = f"{name}_collimator"
@@ -166,8 +177,8 @@ def add_animal_collimator(sim, name, head, collimator_type, debug):
     # Form by two grid repeaters, centers of hexegons are closest pack
     # when 1/sqrt(3) apart. Second repeater grid is offset by 1/2 steps
 
-    step_x = 3.0 * (COLLI_HOLE_RADIUS) + 2.0 * COLLI_SEPTA
-    step_y = math.sqrt(3) * (COLLI_HOLE_RADIUS) + 2.0 * COLLI_SEPTA 
+    step_x = COLLI_STEP_X
+    step_y = COLLI_STEP_Y
     
     nx = int(colli.size[0] / step_x)
     ny = int(colli.size[1] / step_y)
@@ -188,7 +199,7 @@ def add_animal_collimator(sim, name, head, collimator_type, debug):
     
     return colli
 
-def add_animal_spect_two_heads(sim, radius=10*gate.g4_units.cm, debug=False):
+def add_animal_spect_two_heads(sim, radius=10*cm, debug=False):
     """
     Adds two SPECT heads at 0 and 180 degrees.
     """
@@ -199,29 +210,33 @@ def add_animal_spect_two_heads(sim, radius=10*gate.g4_units.cm, debug=False):
     h2, c2, cry2 = add_animal_spect_head(sim, "head2", collimator_type="lehr", debug=debug)
     
     # Position them
-    r1 = Rotation.from_euler("x", -90, degrees=True)
     h1.translation = [0, -radius, 0]
-    h1.rotation = r1.as_matrix()
+    h1.rotation = ROT_X_NEG90.copy()
     
     # Head 2
     # Position: [0, -radius, 0]
     # Rotation: Point +Z to [0,0,0].
     # Rotate +90 X: +Z becomes +Y.
-    r2 = Rotation.from_euler("x", 90, degrees=True)
     h2.translation = [0, radius, 0]
-    h2.rotation = r2.as_matrix()
+    h2.rotation = ROT_X_POS90.copy()
     
     return [h1, h2], [cry1, cry2]
 
-def create_simulation(debug=False):
-    sim = gate.Simulation()
-    
+def build_geometry(sim, debug=False):
+    """
+    Geometry phase: materials, world, the two heads, physics and cuts.
+
+    Everything here is independent of the source, so a sweep over source
+    settings can build it once and only swap the source between runs.
+    """
     # 1. Materials
     add_materials(sim)
-    sim.check_volumes_overlap = True
+    # Pairwise overlap test at init is expensive with thousands of
+    # collimator holes; only run it when checking geometry
+    sim.check_volumes_overlap = debug
     
     # 2. World
-    sim.world.size = [100 * gate.g4_units.cm, 100 * gate.g4_units.cm, 100 * gate.g4_units.cm]
+    sim.world.size = [100 * cm, 100 * cm, 100 * cm]
     sim.world.material = "Air"
     sim.world.visible = False
     sim.world.color = [1, 0, 0, 0]
@@ -236,55 +251,119 @@ def create_simulation(debug=False):
     # We want Face at ~6-7 cm from center.
     # So Center R = 7cm + HEAD_LENGTH/2 = 7 + 7.5 = 14.5 cm.
     
-    face_distance = 7.0 * gate.g4_units.cm # 2cm clearance from 10cm FOV
+    face_distance = 7.0 * cm # 2cm clearance from 10cm FOV
     center_radius = face_distance + HEAD_LENGTH / 2.0
     
     heads, crystals = add_animal_spect_two_heads(sim, radius=center_radius, debug=debug)
     
     # 4. Physics
     sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
-    
-    # # 5. Source (Simple point source for testing)
-    source = sim.add_source("GenericSource", "point_source")
+
+    # Production cuts: coarse in air and lead, where secondaries deposit
+    # locally and never reach a crystal; fine only inside the crystals
+    set_cut = sim.physics_manager.set_production_cut
+    set_cut("world", "all", 10 * mm)
+    for head in heads:
+        set_cut(f"{head.name}_shielding", "all", 5 * mm)
+        set_cut(f"{head.name}_collimator", "all", 5 * mm)
+    for cry in crystals:
+        set_cut(cry.name, "all", 0.1 * mm)
+
+    return heads, crystals
+
+def add_point_source(sim, heads, name="point_source", energy=140.5 * keV,
+                     activity=1000 * Bq, radius=1 * cm):
+    """
+    Source phase: a spherical gamma source at the origin (Tc99m by default).
+    """
+    source = sim.add_source("GenericSource", name)
     source.particle = "gamma"
-    source.energy.mono = 140.5 * gate.g4_units.keV # Tc99m
-    source.activity = 1000 * gate.g4_units.Bq
+    source.energy.mono = energy
+    source.activity = activity
     source.position.type = "sphere"
-    source.position.radius = 1 * gate.g4_units.cm
+    source.position.radius = radius
     source.direction.type = "iso"
-    
-    # 6. Digitizer / Actors
+    # Only emit towards the heads: primaries that cannot intersect any head
+    # volume are rejected at generation instead of being tracked
+    source.direction.angular_acceptance.policy = "Rejection"
+    source.direction.angular_acceptance.target_volumes = [h.name for h in heads]
+    source.direction.angular_acceptance.enable_intersection_check = True
+    source.direction.angular_acceptance.skip_policy = "SkipEvents"
+
+    return source
+
+def add_digitizer(sim, crystals, save_hits=False, save_singles=False):
+    """
+    Hits -> singles -> Tc99m energy window -> projection chain, per crystal.
+    """
+    # Loop-invariant values resolved once for all heads
+    add_actor = sim.add_actor
+    hit_attributes = ["PostPosition", "TotalEnergyDeposit", "GlobalTime", "PreStepUniqueVolumeID"]
+    ewin_min, ewin_max = 126 * keV, 154 * keV
+    proj_size = [128, 128]
+    proj_spacing = [2 * mm, 2 * mm]
+
+    projections = []
     for i, cry in enumerate(crystals):
-        print(i)
+        cry_name = cry.name
+
         # Hits
-        hc = sim.add_actor("DigitizerHitsCollectionActor", f"Hits_{i}")
-        hc.attached_to = cry.name
-        hc.output_filename = f"hits_{i}.root"
-        hc.attributes = ["PostPosition", "TotalEnergyDeposit", "GlobalTime", "PreStepUniqueVolumeID"]
+        hc = add_actor("DigitizerHitsCollectionActor", f"Hits_{i}")
+        hc.attached_to = cry_name
+        # Kept in memory unless requested: the projection is the end product,
+        # and one ROOT writer per head makes long runs I/O bound
+        hc.output_filename = f"hits_{i}.root" if save_hits else ""
+        hc.attributes = list(hit_attributes)
         
         # Singles (Adder)
-        sc = sim.add_actor("DigitizerAdderActor", f"Singles_{i}")
-        sc.attached_to = cry.name
+        sc = add_actor("DigitizerAdderActor", f"Singles_{i}")
+        sc.attached_to = cry_name
         sc.input_digi_collection = hc.name
         sc.policy = "EnergyWinnerPosition"
+        sc.output_filename = f"singles_{i}.root" if save_singles else ""
         
         # Energy Window
         channel_name = f"Tc99m_{i}"
-        cc = sim.add_actor("DigitizerEnergyWindowsActor", f"EnergyWin_{i}")
-        cc.attached_to = cry.name
+        cc = add_actor("DigitizerEnergyWindowsActor", f"EnergyWin_{i}")
+        cc.attached_to = cry_name
         cc.input_digi_collection = sc.name
-        cc.channels = [{"name": channel_name, "min": 126 * gate.g4_units.keV, "max": 154 * gate.g4_units.keV}]
+        cc.channels = [{"name": channel_name, "min": ewin_min, "max": ewin_max}]
         
         # Projection
-        proj = sim.add_actor("DigitizerProjectionActor", f"Projection_{i}")
-        proj.attached_to = cry.name
+        proj = add_actor("DigitizerProjectionActor", f"Projection_{i}")
+        proj.attached_to = cry_name
         proj.input_digi_collections = [channel_name]
-        proj.size = [128, 128]
-        proj.spacing = [2*gate.g4_units.mm, 2*gate.g4_units.mm]
+        proj.size = list(proj_size)
+        proj.spacing = list(proj_spacing)
         proj.output_filename = f"projection_{i}.mhd"
+        projections.append(proj)
+
+    return projections
+
+def create_simulation(debug=False, threads=None, seed="auto", save_hits=False, save_singles=False,
+                      output_dir="output"):
+    sim = gate.Simulation()
+    # Actor output_filename values below are relative to this directory;
+    # OpenGATE joins the paths and creates the directory when writing
+    sim.output_dir = output_dir
+
+    # Geant4 multithreading: primaries are independent, so tracking scales
+    # with cores. Each worker is seeded from the master seed.
+    sim.number_of_threads = max(1, threads or os.cpu_count() or 1)
+    sim.random_engine = "MixMaxRng"
+    sim.random_seed = seed
+    
+    # 1-4. Materials, world, heads, physics
+    heads, crystals = build_geometry(sim, debug=debug)
+    
+    # 5. Source (Simple point source for testing)
+    add_point_source(sim, heads)
+    
+    # 6. Digitizer / Actors
+    add_digitizer(sim, crystals, save_hits=save_hits, save_singles=save_singles)
 
     # 7. Simulation parameters
-    sim.run_timing_intervals = [[0, 300 * gate.g4_units.second]]
+    sim.run_timing_intervals = [[0, 300 * second]]
     
     return sim
 
@@ -292,12 +371,24 @@ def create_simulation(debug=False):
 @click.command()
 @click.option('--visu', is_flag=True, help='Enable visualization')
 @click.option('--visu-type', default='vrml', type=click.Choice(['vrml', 'qt']), help='Visualization type')
-def main(visu, visu_type):
-    sim = create_simulation(debug=True)
+@click.option('--threads', default=None, type=int, help='Geant4 worker threads (default: all cores)')
+@click.option('--seed', default='auto', help='Random seed (integer or "auto")')
+@click.option('--debug', is_flag=True, help='Check volume overlaps at initialisation')
+@click.option('--save-hits', is_flag=True, help='Write per-head hits ROOT files (debugging)')
+@click.option('--save-singles', is_flag=True, help='Write per-head singles ROOT files (debugging)')
+@click.option('--output-dir', default='output', help='Directory for projections and ROOT files')
+def main(visu, visu_type, threads, seed, debug, save_hits, save_singles, output_dir):
+    seed = seed if seed == 'auto' else int(seed)
+    sim = create_simulation(debug=debug, threads=threads, seed=seed,
+                            save_hits=save_hits, save_singles=save_singles,
+                            output_dir=output_dir)
     
     # Visualization
     sim.visu = visu
     sim.visu_type = visu_type
+    if visu:
+        # Geant4 visualization only runs single-threaded
+        sim.number_of_threads = 1
     
     sim.run() 
 
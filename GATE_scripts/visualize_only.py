@@ -7,15 +7,20 @@ This script only visualizes geometry without running simulation.
 Translated from GATE 9 macro to GATE 10 Python
 """
 
-import opengate as gate
-from geom_spect import setup_geometry
+# opengate (Geant4 bindings) is imported inside _build_sim() so argument
+# dispatch does not pay for it
 
 
-def main():
-    """Main function to visualize SPECT geometry."""
+def _build_sim(visu_type="qt"):
+    """
+    Simulation set up for geometry display, shared by both entry points.
 
-    # Units
-    cm = gate.g4_units.cm
+    Returns:
+    --------
+    tuple : (sim, crystal)
+    """
+    import opengate as gate
+    from geom_spect import setup_geometry
 
     # Create simulation
     sim = gate.Simulation()
@@ -30,11 +35,7 @@ def main():
     # VISUALIZATION SETTINGS
     # =====================================================
     sim.visu = True
-    sim.visu_type = "qt"  # Use Qt visualization
-    # Alternative: sim.visu_type = "vrml" for file export
-
-    # Visualization parameters (Qt viewer settings)
-    sim.visu_verbose = False
+    sim.visu_type = visu_type
 
     # =====================================================
     # SETUP GEOMETRY
@@ -48,6 +49,18 @@ def main():
         num_heads=2          # Dual-head system
     )
 
+    return sim, crystal
+
+
+def main():
+    """Main function to visualize SPECT geometry."""
+
+    sim, crystal = _build_sim("qt")  # Use Qt visualization
+    # Alternative: _build_sim("vrml") for file export
+
+    # Visualization parameters (Qt viewer settings)
+    sim.visu_verbose = False
+
     # =====================================================
     # PHYSICS (minimal for visualization)
     # =====================================================
@@ -74,32 +87,10 @@ def export_geometry_vrml():
     Useful when Qt display is not available.
     """
 
-    # Units
-    cm = gate.g4_units.cm
-
-    # Create simulation
-    sim = gate.Simulation()
-    sim.random_engine = "MersenneTwister"
-    sim.random_seed = "auto"
-    sim.check_volumes_overlap = True
-    sim.g4_verbose = False
-    sim.number_of_threads = 1
-    sim.output_dir = "output"
-
     # Use VRML export instead of Qt
-    sim.visu = True
-    sim.visu_type = "vrml"
+    sim, crystal = _build_sim("vrml")
     # sim.visu_filename = "geometry_spect.wrl"
 
-    # Setup geometry
-    crystal = setup_geometry(
-        sim,
-        detector_radius=30,
-        fov_radius=5,
-        fov_height=10,
-        num_heads=2
-    )
-
     # Physics
     # sim.physics_manager.physics_list_name = "G4EmStandardPhysics_option4"
 